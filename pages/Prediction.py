@@ -1,224 +1,206 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
-import pickle
-from catboost import CatBoostClassifier
-from xgboost import XGBClassifier
-from lightgbm import LGBMClassifier
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 st.title("📈 Predict Dividend Change using yFinance Data")
 
-ticker_input = st.text_input("Enter a Ticker Symbol (e.g., AAPL, MSFT, GE):", value="AAPL")
-industry = st.selectbox("Select Industry", ["Consumer", "Financials", "Energy", "Other"])
-model_option = st.selectbox("Choose a Model:", ["CatBoost", "XGBoost", "LightGBM"])
-
-def safe_get(df, key):
-    df = df.T
-    return df[key].iloc[0] if key in df.columns else 0
-
-def safe_div(a, b):
-    try:
-        return float(a) / float(b) if a and b and b != 0 else 0
-    except:
-        return 0
-
-if st.button("🔍 Fetch & Predict"):
-    try:
-        stock = yf.Ticker(ticker_input)
-
-        # Use older-style quarterly attributes
-        income_raw = stock.get_income_stmt(freq="quarterly")
-        balance_raw = stock.get_balance_sheet(freq="quarterly")
-        cashflow_raw = stock.get_cash_flow(freq="quarterly")
-
-        
-        # Show raw results for debugging
-        st.write("🧾 Income Statement Shape:", income_raw.shape)
-        st.write("🧾 Balance Sheet Shape:", balance_raw.shape)
-        st.write("🧾 Cash Flow Shape:", cashflow_raw.shape)
-
-        if income_raw.empty or balance_raw.empty or cashflow_raw.empty:
-            st.error("❌ One or more financial statements are unavailable. Try a different ticker.")
-            st.stop()
-
-        short_debt = safe_get(balance_raw, "Short Long Term Debt")
-        long_debt = safe_get(balance_raw, "Long Term Debt")
-        total_debt = short_debt + long_debt
-
-        ratios = {
-            'dpr': safe_div(safe_get(cashflow_raw, "Cash Dividends Paid"), safe_get(income_raw, "Net Income")),
-            'roe': safe_div(safe_get(income_raw, "Net Income"), safe_get(balance_raw, "Stockholders Equity")),
-            'roa': safe_div(safe_get(income_raw, "Net Income"), safe_get(balance_raw, "Total Assets")),
-            'GProf': safe_div(safe_get(income_raw, "Gross Profit"), safe_get(income_raw, "Total Revenue")),
-            'npm': safe_div(safe_get(income_raw, "Net Income"), safe_get(income_raw, "Total Revenue")),
-            'fcf_ocf': safe_div(safe_get(cashflow_raw, "Free Cash Flow"), safe_get(cashflow_raw, "Operating Cash Flow")),
-            'cash_debt': safe_div(safe_get(balance_raw, "Cash And Cash Equivalents"), total_debt),
-            'cash_lt': safe_div(safe_get(balance_raw, "Cash And Cash Equivalents"), long_debt),
-            'ocf_lct': safe_div(safe_get(cashflow_raw, "Operating Cash Flow"), total_debt),
-            'totdebt_invcap': safe_div(total_debt, safe_get(balance_raw, "Invested Capital")),
-            'de_ratio': safe_div(total_debt, safe_get(balance_raw, "Stockholders Equity")),
-            'debt_ebitda': safe_div(total_debt, safe_get(income_raw, "EBITDA")),
-            'intcov_ratio': safe_div(safe_get(income_raw, "EBIT"), safe_get(income_raw, "Interest Expense")),
-            'curr_ratio': safe_div(safe_get(balance_raw, "Current Assets"), safe_get(balance_raw, "Current Liabilities")),
-            'cash_ratio': safe_div(safe_get(balance_raw, "Cash And Cash Equivalents"), safe_get(balance_raw, "Current Liabilities")),
-            'quick_ratio': safe_div(safe_get(balance_raw, "Current Assets") - safe_get(balance_raw, "Inventory"), safe_get(balance_raw, "Current Liabilities")),
-        }
-
-        input_df = pd.DataFrame([ratios])
-        input_df.fillna(0, inplace=True)
-        if input_df.isnull().values.any():
-            st.warning("⚠️ Warning: NaN detected in input. Filling with 0.")
-
-        st.subheader("📋 Computed Financial Ratios")
-        st.dataframe(input_df.T)
-
-        sector_key = industry.lower()
-        model_paths = {
-            "CatBoost": f"models/catboost_model_{sector_key}.pkl",
-            "XGBoost": f"models/xgboost_model_{sector_key}.pkl",
-            "LightGBM": f"models/lightgbm_model_{sector_key}.pkl",
-        }
-
-        model_path = model_paths[model_option]
-        with open(model_path, "rb") as f:
-            model = pickle.load(f)
-
-        y_pred = model.predict(input_df)
-        y_proba = model.predict_proba(input_df)[0]
-
-        label_map = {-1: "📉 Decrease", 0: "➖ No Change", 1: "📈 Increase"}
-        pred = int(y_pred.flatten()[0]) if hasattr(y_pred, 'flatten') else int(y_pred[0])
-        st.success(f"📊 Predicted Dividend Change: *{label_map[pred]}*")
-
-        proba_map = {-1: y_proba[-1], 0: y_proba[0], 1: y_proba[1]}
-        proba_df = pd.DataFrame.from_dict({label_map[k]: [v] for k, v in proba_map.items()}, orient='columns')
-        st.subheader("🔢 Prediction Probabilities")
-        st.bar_chart(proba_df.T.rename(columns={0: "Probability"}))
-
-        st.session_state.prediction_label = label_map[pred]
-        st.session_state.input_df = input_df
-        st.session_state.ticker = ticker_input
-        st.session_state.industry = industry
-
-        # Simple GPT-style explanation
-        st.markdown("---")
-        st.title("GPT-Style Analysis of Dividend Prediction")
-        st.markdown(f"### Ticker: `{ticker_input}` | Industry: `{industry}`")
-        st.markdown(f"### 📊 Predicted Dividend Change: **{label_map[pred]}**")
-
-    except Exception as e:
-        st.error(f"❌ Error during prediction: {e}")
-
-
-import streamlit as st
-import yfinance as yf
-import pandas as pd
-import pickle
-from catboost import CatBoostClassifier
-from xgboost import XGBClassifier
-from lightgbm import LGBMClassifier
-
-st.title("📈 Predict Dividend Change using yFinance Data")
+# --- Model Files ---
+# All models are served as ONNX exports (see scripts/convert_models.py)
+INDUSTRIES = ["Consumer", "Financials", "Energy", "Other"]
+MODELS = ["CatBoost", "XGBoost", "LightGBM"]
+MODEL_PATHS = {
+    (model, sector.lower()): f"models/{model.lower()}_model_{sector.lower()}.onnx"
+    for model in MODELS
+    for sector in INDUSTRIES
+}
 
 # --- User Inputs ---
-ticker_input = st.text_input("Enter a Ticker Symbol (e.g., AAPL, MSFT, GE):", value="AAPL")
-industry = st.selectbox("Select Industry", ["Consumer", "Financials", "Energy", "Other"])
-model_option = st.selectbox("Choose a Model:", ["CatBoost", "XGBoost", "LightGBM"])
+# Inside a form, edits don't rerun the script until the submit button is pressed
+with st.form("predict_form"):
+    ticker_input = st.text_input("Enter Ticker Symbols, comma-separated (e.g., AAPL, MSFT, GE):", value="AAPL")
+    industry = st.selectbox("Select Industry", INDUSTRIES)
+    model_option = st.selectbox("Choose a Model:", MODELS)
+    show_raw = st.checkbox("Show raw statements", value=False)
+    submitted = st.form_submit_button("🔍 Fetch & Predict")
+
+# --- Feature Spec ---
+# (ratio, numerator statement, numerator key, denominator statement, denominator key),
+# in the column order the models were trained on. "calc" holds derived line items.
+FEATURES = (
+    ("dpr", "cf", "Cash Dividends Paid", "inc", "Net Income"),
+    ("roe", "inc", "Net Income", "bal", "Stockholders Equity"),
+    ("roa", "inc", "Net Income", "bal", "Total Assets"),
+    ("GProf", "inc", "Gross Profit", "inc", "Total Revenue"),
+    ("npm", "inc", "Net Income", "inc", "Total Revenue"),
+    ("fcf_ocf", "cf", "Free Cash Flow", "cf", "Operating Cash Flow"),
+    ("cash_debt", "bal", "Cash And Cash Equivalents", "calc", "Total Debt"),
+    ("cash_lt", "bal", "Cash And Cash Equivalents", "bal", "Long Term Debt"),
+    ("ocf_lct", "cf", "Operating Cash Flow", "calc", "Total Debt"),
+    ("totdebt_invcap", "calc", "Total Debt", "bal", "Invested Capital"),
+    ("de_ratio", "calc", "Total Debt", "bal", "Stockholders Equity"),
+    ("debt_ebitda", "calc", "Total Debt", "inc", "EBITDA"),
+    ("intcov_ratio", "inc", "EBIT", "inc", "Interest Expense"),
+    ("curr_ratio", "bal", "Current Assets", "bal", "Current Liabilities"),
+    ("cash_ratio", "bal", "Cash And Cash Equivalents", "bal", "Current Liabilities"),
+    ("quick_ratio", "calc", "Quick Assets", "bal", "Current Liabilities"),
+)
+RATIO_NAMES = [name for name, *_ in FEATURES]
 
 # --- Safe Functions ---
-def safe_div(a, b):
+def safe_get(lookup, key):
+    value = lookup.get(key, 0)
+    return 0 if pd.isna(value) else value
+
+def compute_ratios(income_raw, balance_raw, cashflow_raw):
+    """Return the FEATURES ratios for the most recent quarter as a float64 array."""
+    # Select the latest quarter once per statement; dict lookups are far cheaper than Series.get
+    inc_col = income_raw.iloc[:, 0].to_dict()
+    bal_col = balance_raw.iloc[:, 0].to_dict()
+    cf_col = cashflow_raw.iloc[:, 0].to_dict()
+
+    short_debt = safe_get(bal_col, "Short Long Term Debt")
+    long_debt = safe_get(bal_col, "Long Term Debt")
+
+    statements = {
+        "inc": inc_col,
+        "bal": bal_col,
+        "cf": cf_col,
+        "calc": {
+            "Total Debt": short_debt + long_debt,
+            "Quick Assets": safe_get(bal_col, "Current Assets") - safe_get(bal_col, "Inventory"),
+        },
+    }
+    nums = np.array([safe_get(statements[stmt], key) for _, stmt, key, _, _ in FEATURES], dtype=np.float64)
+    denoms = np.array([safe_get(statements[stmt], key) for _, _, _, stmt, key in FEATURES], dtype=np.float64)
+    return np.divide(nums, denoms, out=np.zeros_like(nums), where=denoms != 0)
+
+@st.cache_resource
+def yf_session():
+    """One keep-alive HTTP session shared by every Ticker across reruns."""
     try:
-        return float(a) / float(b) if a and b and b != 0 else 0
-    except:
-        return 0
-
-def safe_get(series, key):
-    return series.get(key, 0) or 0
-
-if st.button("🔍 Fetch & Predict"):
+        # Recent yfinance releases need a curl_cffi session to get past Yahoo's bot checks
+        from curl_cffi import requests as curl_requests
+
+        return curl_requests.Session(impersonate="chrome")
+    except ImportError:
+        import requests
+
+        session = requests.Session()
+        session.headers["User-Agent"] = "Mozilla/5.0"
+        return session
+
+@st.cache_resource
+def fetch_pool():
+    """Long-lived workers for statement fetches; curl_cffi keeps one connection per thread,
+    so reusing the threads is what lets reruns reuse open connections."""
+    return ThreadPoolExecutor(max_workers=3)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_statements(ticker: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Fetch quarterly (income, balance sheet, cash flow) for a ticker, cached for an hour."""
+    stock = yf.Ticker(ticker, session=yf_session())
+    # The three statements are independent requests, so issue them concurrently
+    futures = [
+        fetch_pool().submit(getattr, stock, attr)
+        for attr in ("quarterly_income_stmt", "quarterly_balance_sheet", "quarterly_cashflow")
+    ]
+    income_raw, balance_raw, cashflow_raw = (future.result() for future in futures)
+    # yfinance often returns empty frames instead of raising on network errors;
+    # raise so the failure isn't cached for the next hour
+    if income_raw.empty or balance_raw.empty or cashflow_raw.empty:
+        raise ValueError("one or more financial statements are unavailable")
+    return income_raw, balance_raw, cashflow_raw
+
+@st.cache_resource
+def load_session(model_option: str, sector_key: str):
+    """Create the ONNX Runtime session for the selected sector model once per process."""
+    import onnxruntime as ort
+
+    return ort.InferenceSession(MODEL_PATHS[(model_option, sector_key)], providers=["CPUExecutionProvider"])
+
+def predict(session, X):
+    """Return (predicted classes, class probabilities) with probability columns in ascending class order."""
+    y_pred, y_proba = session.run(None, {session.get_inputs()[0].name: X})
+    if isinstance(y_proba, list):
+        # CatBoost's native export emits one {class: probability} map per row
+        y_proba = np.array([[row[c] for c in sorted(row)] for row in y_proba])
+    return y_pred, y_proba
+
+if submitted:
     try:
-        stock = yf.Ticker(ticker_input)
-
-        income_raw = stock.quarterly_income_stmt
-        balance_raw = stock.quarterly_balance_sheet
-        cashflow_raw = stock.quarterly_cashflow
-
-        st.write("🧾 Income Statement Shape:", income_raw.shape)
-        st.write("🧾 Balance Sheet Shape:", balance_raw.shape)
-        st.write("🧾 Cash Flow Shape:", cashflow_raw.shape)
+        tickers = list(dict.fromkeys(t.strip().upper() for t in ticker_input.split(",") if t.strip()))
+        if not tickers:
+            st.error("❌ Enter at least one ticker symbol.")
+            st.stop()
 
-        if income_raw.empty or balance_raw.empty or cashflow_raw.empty:
+        rows, valid_tickers = [], []
+        for ticker in tickers:
+            try:
+                income_raw, balance_raw, cashflow_raw = fetch_statements(ticker)
+            except Exception as e:
+                st.warning(f"⚠️ Skipping {ticker}: {e}")
+                continue
+
+            if show_raw:
+                st.write(f"🧾 {ticker} Income Statement Shape:", income_raw.shape)
+                st.dataframe(income_raw)
+                st.write(f"🧾 {ticker} Balance Sheet Shape:", balance_raw.shape)
+                st.dataframe(balance_raw)
+                st.write(f"🧾 {ticker} Cash Flow Shape:", cashflow_raw.shape)
+                st.dataframe(cashflow_raw)
+
+            rows.append(compute_ratios(income_raw, balance_raw, cashflow_raw))
+            valid_tickers.append(ticker)
+
+        if not rows:
             st.error("❌ One or more financial statements are unavailable. Try a different ticker.")
             st.stop()
 
-        # Take most recent quarter
-        income_stmt = income_raw.iloc[:, 0]
-        balance_sheet = balance_raw.iloc[:, 0]
-        cashflow_stmt = cashflow_raw.iloc[:, 0]
-
-        short_debt = safe_get(balance_sheet, "Short Long Term Debt")
-        long_debt = safe_get(balance_sheet, "Long Term Debt")
-        total_debt = short_debt + long_debt
-
-        # --- Compute Ratios ---
-        ratios = {
-            'dpr': safe_div(safe_get(cashflow_stmt, "Cash Dividends Paid"), safe_get(income_stmt, "Net Income")),
-            'roe': safe_div(safe_get(income_stmt, "Net Income"), safe_get(balance_sheet, "Stockholders Equity")),
-            'roa': safe_div(safe_get(income_stmt, "Net Income"), safe_get(balance_sheet, "Total Assets")),
-            'GProf': safe_div(safe_get(income_stmt, "Gross Profit"), safe_get(income_stmt, "Total Revenue")),
-            'npm': safe_div(safe_get(income_stmt, "Net Income"), safe_get(income_stmt, "Total Revenue")),
-            'fcf_ocf': safe_div(safe_get(cashflow_stmt, "Free Cash Flow"), safe_get(cashflow_stmt, "Operating Cash Flow")),
-            'cash_debt': safe_div(safe_get(balance_sheet, "Cash And Cash Equivalents"), total_debt),
-            'cash_lt': safe_div(safe_get(balance_sheet, "Cash And Cash Equivalents"), long_debt),
-            'ocf_lct': safe_div(safe_get(cashflow_stmt, "Operating Cash Flow"), total_debt),
-            'totdebt_invcap': safe_div(total_debt, safe_get(balance_sheet, "Invested Capital")),
-            'de_ratio': safe_div(total_debt, safe_get(balance_sheet, "Stockholders Equity")),
-            'debt_ebitda': safe_div(total_debt, safe_get(income_stmt, "EBITDA")),
-            'intcov_ratio': safe_div(safe_get(income_stmt, "EBIT"), safe_get(income_stmt, "Interest Expense")),
-            'curr_ratio': safe_div(safe_get(balance_sheet, "Current Assets"), safe_get(balance_sheet, "Current Liabilities")),
-            'cash_ratio': safe_div(safe_get(balance_sheet, "Cash And Cash Equivalents"), safe_get(balance_sheet, "Current Liabilities")),
-            'quick_ratio': safe_div(safe_get(balance_sheet, "Current Assets") - safe_get(balance_sheet, "Inventory"), safe_get(balance_sheet, "Current Liabilities")),
-        }
+        vals = np.vstack(rows)
+        nan_mask = ~np.isfinite(vals)
+        if nan_mask.any():
+            st.warning("⚠️ Non-finite ratios detected; filled with zeros.")
+            vals[nan_mask] = 0.0
 
         # --- Format Input ---
-        input_df = pd.DataFrame([ratios])
-        input_df.fillna(0, inplace=True)
-        if input_df.isnull().values.any():
-            st.warning("⚠️ NaNs detected. Filled with zeros.")
+        input_df = pd.DataFrame(vals, index=valid_tickers, columns=RATIO_NAMES)
 
         st.subheader("📋 Computed Financial Ratios")
         st.dataframe(input_df.T)
 
         # --- Load Model ---
-        sector_key = industry.lower()
-        model_paths = {
-            "CatBoost": f"models/catboost_model_{sector_key}.pkl",
-            "XGBoost": f"models/xgboost_model_{sector_key}.pkl",
-            "LightGBM": f"models/lightgbm_model_{sector_key}.pkl",
-        }
-        model_path = model_paths[model_option]
-        with open(model_path, "rb") as f:
-            model = pickle.load(f)
+        session = load_session(model_option, industry.lower())
 
         # --- Predict ---
-        y_pred = model.predict(input_df)
-        y_proba = model.predict_proba(input_df)[0]
-        label_map = {-1: "📉 Decrease", 0: "➖ No Change", 1: "📈 Increase"}
-        pred = int(y_pred.flatten()[0]) if hasattr(y_pred, 'flatten') else int(y_pred[0])
-        st.success(f"📊 Predicted Dividend Change: **{label_map[pred]}**")
+        # One batched call for all tickers; the DataFrame is only for display
+        X = vals.astype(np.float32)
+        y_pred, y_proba = predict(session, X)
+        # Models were trained on change_div mapped -1/0/1 -> 0/1/2
+        label_map = {0: "📉 Decrease", 1: "➖ No Change", 2: "📈 Increase"}
+        pred_labels = [label_map[int(pred)] for pred in y_pred]
+        for ticker, pred_label in zip(valid_tickers, pred_labels):
+            st.success(f"📊 {ticker} Predicted Dividend Change: **{pred_label}**")
 
         # --- Probabilities ---
-        proba_map = {-1: y_proba[-1], 0: y_proba[0], 1: y_proba[1]}
-        proba_df = pd.DataFrame.from_dict({label_map[k]: [v] for k, v in proba_map.items()}, orient="columns")
+        # One stacked bar per ticker, so each bar's segments sum to 1
+        proba_df = pd.DataFrame(y_proba, index=valid_tickers, columns=[label_map[c] for c in sorted(label_map)])
         st.subheader("🔢 Prediction Probabilities")
-        st.bar_chart(proba_df.T.rename(columns={0: "Probability"}))
+        st.bar_chart(proba_df)
 
         # --- Cache for GPT ---
-        st.session_state.prediction_label = label_map[pred]
+        st.session_state.prediction_labels = dict(zip(valid_tickers, pred_labels))
         st.session_state.input_df = input_df
-        st.session_state.ticker = ticker_input
+        st.session_state.tickers = valid_tickers
         st.session_state.industry = industry
 
+        # Simple GPT-style explanation
+        st.markdown("---")
+        st.title("GPT-Style Analysis of Dividend Prediction")
+        for ticker, pred_label in zip(valid_tickers, pred_labels):
+            st.markdown(f"### Ticker: `{ticker}` | Industry: `{industry}`")
+            st.markdown(f"### 📊 Predicted Dividend Change: **{pred_label}**")
+
     except Exception as e:
         st.error(f"❌ Error during prediction: {e}")
-
@@ -0,0 +1,75 @@
+"""One-off export of the pickled sector models to ONNX for serving with onnxruntime.
+
+The Prediction page only needs onnxruntime at runtime. Exporting needs the
+training libraries plus onnxmltools and skl2onnx:
+
+    pip install onnxmltools skl2onnx
+
+CatBoost exports ONNX natively; XGBoost goes through onnxmltools. The LightGBM
+models are sklearn VotingClassifier ensembles (LightGBM + Logistic Regression +
+Decision Tree), so they go through skl2onnx with the LightGBM converter registered.
+
+Run from the repository root:  python scripts/convert_models.py
+"""
+import pickle
+
+from lightgbm import LGBMClassifier
+from onnxmltools import convert_xgboost
+from onnxmltools.convert.common.data_types import FloatTensorType as XgbFloatTensorType
+from onnxmltools.convert.lightgbm.operator_converters.LightGbm import convert_lightgbm
+from skl2onnx import convert_sklearn, update_registered_converter
+from skl2onnx.common.data_types import FloatTensorType as SklFloatTensorType
+from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+
+SECTORS = ["consumer", "financials", "energy", "other"]
+N_FEATURES = 16
+TARGET_OPSET = {"": 15, "ai.onnx.ml": 3}
+
+update_registered_converter(
+    LGBMClassifier,
+    "LightGbmLGBMClassifier",
+    calculate_linear_classifier_output_shapes,
+    convert_lightgbm,
+    options={"nocl": [True, False], "zipmap": [True, False, "columns"]},
+)
+
+
+def export_catboost(model, dst):
+    model.save_model(dst, format="onnx")
+
+
+def export_xgboost(model, dst):
+    # The converter expects positional f0..fN feature names
+    model.get_booster().feature_names = None
+    onnx_model = convert_xgboost(
+        model,
+        initial_types=[("input", XgbFloatTensorType([None, N_FEATURES]))],
+        target_opset=TARGET_OPSET[""],
+    )
+    with open(dst, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+
+def export_lightgbm(model, dst):
+    # flatten_transform only affects transform(), which skl2onnx cannot convert
+    model.flatten_transform = False
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[("input", SklFloatTensorType([None, N_FEATURES]))],
+        target_opset=TARGET_OPSET,
+        options={id(model): {"zipmap": False}},
+    )
+    with open(dst, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+
+EXPORTERS = {"catboost": export_catboost, "xgboost": export_xgboost, "lightgbm": export_lightgbm}
+
+for name, export in EXPORTERS.items():
+    for sector in SECTORS:
+        src = f"models/{name}_model_{sector}.pkl"
+        dst = f"models/{name}_model_{sector}.onnx"
+        with open(src, "rb") as f:
+            model = pickle.load(f)
+        export(model, dst)
+        print(f"✅ {src} -> {dst}")